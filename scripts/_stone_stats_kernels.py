@@ -0,0 +1,24 @@
+"""Numba kernels for stone_stats. Importing this module fails without numba."""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def row_stone_counts(buf, n_rows, row_len, width):
+    """Return the stones in each row_len-byte row of buf, -1 for invalid rows.
+
+    Only the first width bytes of each row are board cells. The inner loop
+    is branch-free so that it vectorizes.
+    """
+    counts = np.empty(n_rows, dtype=np.int64)
+    for row in prange(n_rows):
+        base = row * row_len
+        stones = 0
+        invalid = 0
+        for col in range(width):
+            cell = buf[base + col]
+            stones += cell != 45  # "-"
+            invalid += (cell != 79) & (cell != 88) & (cell != 45)  # "O", "X"
+        counts[row] = stones if invalid == 0 else -1
+    return counts
@@ -7,9 +7,48 @@ Usage:
 """
 
 import argparse
+import io
+import mmap
+import os
+import re
+from array import array
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import matplotlib
+
+# Only PNG files are written, so skip interactive backend discovery.
+matplotlib.use("Agg")
 
 import matplotlib.pyplot as plt
+import numpy as np
+
+
+# (vars, clauses) coordinates packed as int64 ("q") arrays: compact, and
+# viewable by NumPy without a copy.
+Points = tuple[array, array]
+
+# Layout written by prunings::kissat: "index=0, ans=true, vars=12, clauses=34".
+_KNOWN_KEYS = {b"index", b"ans", b"vars", b"clauses"}
+_REQUIRED_KEYS = {b"ans", b"vars", b"clauses"}
+# Reduces a validated record to "0,1,12,34": true/false become 1/0 through
+# their first letters (no known key contains t or f), and the remaining
+# letters, "=" and blanks are deleted. "\r" becomes "\n" so bare-"\r" lines
+# stay separate; the empty lines this leaves after "\r\n" are skipped.
+_TO_NUMBERS = bytes.maketrans(b"tf\r", b"10\n")
+_KEY_BYTES = b"abcdeghijklmnopqrsuvwxyz= \t"
+# Size of the line-aligned blocks parsed at once; bounds memory on huge inputs.
+BLOCK_BYTES = 1 << 24
+
+
+def new_points() -> Points:
+    """Return an empty pair of packed coordinate arrays."""
+    return array("q"), array("q")
+
+
+def as_ndarray(values: array) -> np.ndarray:
+    """Return a zero-copy int64 view of a packed coordinate array."""
+    return np.frombuffer(values, dtype=np.int64)
 
 
 def parse_args() -> argparse.Namespace:
@@ -36,6 +75,146 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+def _layout_pattern(segments: list[bytes]) -> bytes:
+    """Return a regex matching any number of lines shaped like the given one.
+
+    Keys and separators must repeat verbatim; ans takes true/false and every
+    other value must be a non-negative integer.
+    """
+    fields = []
+    for segment in segments:
+        key, _, _ = segment.partition(b"=")
+        value = rb"(?:true|false)" if key.strip() == b"ans" else rb"\d+"
+        fields.append(re.escape(key) + b"=" + value)
+    return rb"(?:" + b",".join(fields) + rb"(?:\r\n?|\n))*"
+
+
+def parse_uniform(data: bytes) -> Optional[tuple[Points, Points]]:
+    """Parse records laid out like the first line using bulk bytes and NumPy ops.
+
+    Returns None when any line deviates from that layout so the caller can
+    fall back to `parse_lines`, which also reports malformed lines.
+    """
+    if not data.endswith((b"\n", b"\r")):
+        data += b"\n"
+    # Lines may end in "\n", "\r\n" or a bare "\r", as in text mode.
+    segments = re.match(rb"[^\r\n]*", data).group().split(b",")
+    keys = [segment.partition(b"=")[0].strip() for segment in segments]
+    if not _REQUIRED_KEYS <= set(keys) <= _KNOWN_KEYS:
+        return None
+    if re.fullmatch(_layout_pattern(segments), data) is None:
+        return None
+    try:
+        table = np.loadtxt(
+            io.BytesIO(data.translate(_TO_NUMBERS, _KEY_BYTES)),
+            delimiter=",",
+            dtype=np.int64,
+            ndmin=2,
+        )
+    except ValueError:
+        return None
+
+    is_true = table[:, keys.index(b"ans")] == 1
+    vars_column = table[:, keys.index(b"vars")]
+    clauses_column = table[:, keys.index(b"clauses")]
+    true_points = (
+        array("q", vars_column[is_true].tobytes()),
+        array("q", clauses_column[is_true].tobytes()),
+    )
+    false_points = (
+        array("q", vars_column[~is_true].tobytes()),
+        array("q", clauses_column[~is_true].tobytes()),
+    )
+    return true_points, false_points
+
+
+def _next_line_end(mm: mmap.mmap, pos: int) -> int:
+    """Return the offset just past the first line break at or after pos."""
+    breaks = [i for i in (mm.find(b"\n", pos), mm.find(b"\r", pos)) if i >= 0]
+    if not breaks:
+        return len(mm)
+    end = min(breaks) + 1
+    if mm[end - 1 : end + 1] == b"\r\n":
+        end += 1
+    return end
+
+
+def iter_blocks(mm: mmap.mmap) -> Iterator[bytes]:
+    """Yield consecutive chunks of about BLOCK_BYTES that end on a line break."""
+    start = 0
+    size = len(mm)
+    while start < size:
+        end = size
+        if size - start > BLOCK_BYTES:
+            limit = start + BLOCK_BYTES
+            # Bare "\r" also ends a line, but not in the last byte, where it
+            # may be the first half of "\r\n".
+            end = 1 + max(
+                mm.rfind(b"\n", start, limit), mm.rfind(b"\r", start, limit - 1)
+            )
+            if end <= start:
+                end = _next_line_end(mm, limit - 1)
+        yield mm[start:end]
+        start = end
+
+
+def parse_lines(lines: Iterable[bytes]) -> tuple[Points, Points]:
+    """Parse records one line at a time, accepting keys in any order."""
+    true_points = new_points()
+    false_points = new_points()
+    for raw_line in lines:
+        line = raw_line.decode("utf-8").strip()
+        if not line:
+            continue
+        # Only three keys matter, so keep them in locals instead of a dict.
+        answer = vars_value = clauses_value = None
+        for segment in line.split(","):
+            key, sep, value = segment.partition("=")
+            if not sep:
+                continue
+            key = key.strip()
+            if key == "ans":
+                answer = value
+            elif key == "vars":
+                vars_value = value
+            elif key == "clauses":
+                clauses_value = value
+
+        if answer is None or vars_value is None or clauses_value is None:
+            raise ValueError(f"Failed to parse line: {line}")
+        target = true_points if answer.strip().lower() == "true" else false_points
+        try:
+            # int() ignores surrounding whitespace itself.
+            vars_count = int(vars_value)
+            clauses_count = int(clauses_value)
+            # The packed arrays hold int64; larger counts overflow on append.
+            target[0].append(vars_count)
+            target[1].append(clauses_count)
+        except (ValueError, OverflowError) as err:
+            raise ValueError(f"Failed to parse line: {line}") from err
+    return true_points, false_points
+
+
+def load_points(path: Path) -> tuple[Points, Points]:
+    """Return (true_points, false_points) read through a read-only memory map."""
+    with path.open("rb") as fh:
+        # Empty files cannot be mapped.
+        if os.fstat(fh.fileno()).st_size == 0:
+            return new_points(), new_points()
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            true_points = new_points()
+            false_points = new_points()
+            for block in iter_blocks(mm):
+                # bytes.splitlines honours \n, \r\n and bare \r like text mode.
+                parsed = parse_uniform(block) or parse_lines(block.splitlines())
+                for target, points in zip((true_points, false_points), parsed):
+                    target[0].extend(points[0])
+                    target[1].extend(points[1])
+    return true_points, false_points
+
+
 def main() -> None:
     args = parse_args()
 
@@ -44,57 +223,38 @@ def main() -> None:
         raise FileNotFoundError(f"Input file does not exist: {input_path}")
 
     output_base = args.output_base or input_path.with_suffix("")
-    true_points: tuple[list[int], list[int]] = ([], [])
-    false_points: tuple[list[int], list[int]] = ([], [])
-
-    with input_path.open("r", encoding="utf-8") as fh:
-        for raw_line in fh:
-            line = raw_line.strip()
-            if not line:
-                continue
-            segments = [segment.strip() for segment in line.split(",")]
-            record = {}
-            for segment in segments:
-                if "=" not in segment:
-                    continue
-                key, value = segment.split("=", 1)
-                record[key.strip()] = value.strip()
-
-            try:
-                answer = record["ans"].lower()
-                vars_count = int(record["vars"])
-                clauses_count = int(record["clauses"])
-            except (KeyError, ValueError) as err:
-                raise ValueError(f"Failed to parse line: {line}") from err
-
-            target = true_points if answer == "true" else false_points
-            target[0].append(vars_count)
-            target[1].append(clauses_count)
+    true_points, false_points = load_points(input_path)
 
     if not true_points[0] and not false_points[0]:
         raise ValueError("No records parsed from input file.")
 
-    all_x = true_points[0] + false_points[0]
-    all_y = true_points[1] + false_points[1]
-    x_bounds = (min(all_x), max(all_x))
-    y_bounds = (min(all_y), max(all_y))
+    # Combine per-group extremes rather than concatenating the groups.
+    groups = [
+        (as_ndarray(xs), as_ndarray(ys)) for xs, ys in (true_points, false_points) if xs
+    ]
+    x_bounds = (min(x.min() for x, _ in groups), max(x.max() for x, _ in groups))
+    y_bounds = (min(y.min() for _, y in groups), max(y.max() for _, y in groups))
     base_name = output_base.stem if output_base.suffix else output_base.name
     output_dir = output_base.parent if output_base.parent != Path("") else Path(".")
 
+    # Both plots are drawn on one Figure; the axes are cleared in between.
+    fig, ax = plt.subplots(figsize=(8, 6))
+
     def save_scatter(
-        points: tuple[list[int], list[int]], label: str, color: str, suffix: str
+        points: Points, label: str, color: str, suffix: str
     ) -> None:
         if not points[0]:
             print(f"Skipping {label} plot because there are no points.")
             return
-        fig, ax = plt.subplots(figsize=(8, 6))
+        ax.clear()
         ax.scatter(
-            points[0],
-            points[1],
+            as_ndarray(points[0]),
+            as_ndarray(points[1]),
             s=12,
             alpha=0.6,
             label=label,
             color=color,
+            rasterized=True,
         )
         ax.set_xlim(x_bounds)
         ax.set_ylim(y_bounds)
@@ -110,6 +270,7 @@ def main() -> None:
 
     save_scatter(false_points, "ans = false", "#d95f02", "ans_false")
     save_scatter(true_points, "ans = true", "#1b9e77", "ans_true")
+    plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -2,14 +2,36 @@
 """Collect stone statistics from Othello boards described with O/X/- characters."""
 
 import argparse
+import mmap
 import sys
 from collections import Counter
-from typing import Iterable, Optional, TextIO, List
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, TextIO, List, Union
 
+import numpy as np
 
-def iter_boards(handle: TextIO) -> Iterable[str]:
-    """Yield cleaned, non-empty board strings from the given text handle."""
+try:
+    from _stone_stats_kernels import row_stone_counts as _jit_row_stone_counts
+except ImportError:  # numba is optional; fall back to plain NumPy
+    _jit_row_stone_counts = None
+
+
+BOARD_LEN = 64
+# Size of the line-aligned blocks processed at once; bounds memory on huge
+# inputs, whether they are memory-mapped or streamed from a pipe.
+BLOCK_BYTES = 1 << 22
+
+_NEWLINE = ord("\n")
+_CARRIAGE_RETURN = ord("\r")
+_EMPTY = ord("-")
+_VALID_CELLS = np.zeros(256, dtype=bool)
+_VALID_CELLS[list(b"OX-")] = True
+
+
+def iter_boards(handle: Iterable[Union[str, bytes]]) -> Iterable[str]:
+    """Yield cleaned, non-empty board strings from a handle or iterable of lines."""
     for raw_line in handle:
+        if isinstance(raw_line, bytes):
+            raw_line = raw_line.decode("utf-8")
         board = raw_line.strip()
         if not board:
             continue
@@ -18,25 +40,221 @@ def iter_boards(handle: TextIO) -> Iterable[str]:
 
 def count_stones(board: str) -> int:
     """Return the number of stones (O or X) on the board."""
-    if any(cell not in ("O", "X", "-") for cell in board):
-        raise ValueError(f"Unexpected character in board: {board!r}")
-    return sum(cell in ("O", "X") for cell in board)
+    empty = board.count("-")
+    if len(board) == BOARD_LEN:
+        # Standard boards: three str.count calls are cheaper than a
+        # membership test per cell.
+        if empty + board.count("O") + board.count("X") == BOARD_LEN:
+            return BOARD_LEN - empty
+    # str.strip stops at the first foreign character, so anything left over
+    # means the board is malformed.
+    elif not board.strip("OX-"):
+        return len(board) - empty
+    raise ValueError(f"Unexpected character in board: {board!r}")
 
 
-def summarize(
-    handle: TextIO, target: Optional[int] = None
-) -> tuple[int, Counter[int], List[str]]:
-    """Process the handle, returning (board_count, stone_counter, matching_boards)."""
-    counter = Counter()
+def histogram(
+    handle: Iterable[Union[str, bytes]], target: Optional[int] = None
+) -> tuple[int, np.ndarray, List[str]]:
+    """Process the handle, returning (board_count, stone_histogram, matching_boards).
+
+    stone_histogram[n] is the number of boards holding n stones; it has at
+    least BOARD_LEN + 1 entries.
+    """
+    # A plain list keeps the per-board increment cheap; NumPy scalar
+    # updates cost about as much as the Counter hashing they would replace.
+    bins = [0] * (BOARD_LEN + 1)
     board_count = 0
     matches: List[str] = []
     for board in iter_boards(handle):
         stones = count_stones(board)
-        counter[stones] += 1
+        if stones >= len(bins):
+            bins.extend([0] * (stones + 1 - len(bins)))
+        bins[stones] += 1
         board_count += 1
         if target is not None and stones == target:
             matches.append(board)
-    return board_count, counter, matches
+    return board_count, np.array(bins, dtype=np.int64), matches
+
+
+def _row_stone_counts(rows: np.ndarray, width: int) -> Optional[np.ndarray]:
+    """Return the stones in the first width bytes of each row, or None if invalid."""
+    if _jit_row_stone_counts is not None:
+        n_rows, row_len = rows.shape
+        stones = _jit_row_stone_counts(rows.reshape(-1), n_rows, row_len, width)
+        return None if (stones < 0).any() else stones
+    cells = rows[:, :width]
+    if not _VALID_CELLS[cells].all():
+        return None
+    return np.count_nonzero(cells != _EMPTY, axis=1)
+
+
+def _histogram_fixed_width(
+    data: bytes, target: Optional[int] = None
+) -> Optional[tuple[int, np.ndarray, List[str]]]:
+    """Vectorized histogram of data, or None unless every line has the same width."""
+    row_len = data.find(b"\n") + 1
+    terminator = _NEWLINE
+    cr_len = data.find(b"\r") + 1
+    if cr_len and (not row_len or cr_len < row_len - 1):
+        # Bare "\r" line endings: the first "\r" is not part of a "\r\n".
+        row_len, terminator = cr_len, _CARRIAGE_RETURN
+    if row_len <= 1:
+        return None
+    buf = np.frombuffer(data, dtype=np.uint8)
+    n_rows = buf.size // row_len
+    rows = buf[: n_rows * row_len].reshape(n_rows, row_len)
+    if not (rows[:, -1] == terminator).all():
+        return None
+    width = row_len - 1
+    if (
+        terminator == _NEWLINE
+        and width > 1
+        and (rows[:, width - 1] == _CARRIAGE_RETURN).all()
+    ):
+        width -= 1
+    # A final line without a trailing newline is left over after reshaping.
+    tail = bytes(buf[n_rows * row_len :]).strip()
+    if tail and (len(tail) != width or tail.strip(b"OX-")):
+        return None
+
+    stones = _row_stone_counts(rows, width)
+    if stones is None:
+        return None
+    bins = np.bincount(stones, minlength=max(width, BOARD_LEN) + 1)
+    matches: List[str] = []
+    if target is not None:
+        matches.extend(
+            row[:width].tobytes().decode("ascii") for row in rows[stones == target]
+        )
+    board_count = n_rows
+    if tail:
+        board = tail.decode("ascii")
+        stones = count_stones(board)
+        bins[stones] += 1
+        board_count += 1
+        if stones == target:
+            matches.append(board)
+    return board_count, bins, matches
+
+
+def _iter_blocks(read: Callable[[int], Union[bytes, str]]) -> Iterator[bytes]:
+    """Yield consecutive chunks of about BLOCK_BYTES that end on a line break."""
+    pending = b""
+    while chunk := read(BLOCK_BYTES):
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        block = pending + chunk
+        # Bare "\r" also ends a line; one in the last byte waits for the next
+        # read in case it is the first half of "\r\n".
+        end = max(block.rfind(b"\n"), block.rfind(b"\r", 0, len(block) - 1)) + 1
+        if end == 0:
+            # No line break yet; keep reading until the line is complete.
+            pending = block
+            continue
+        yield block[:end]
+        pending = block[end:]
+    if pending:
+        yield pending
+
+
+def _histogram_stream(
+    read: Callable[[int], Union[bytes, str]], target: Optional[int] = None
+) -> tuple[int, np.ndarray, List[str]]:
+    """Histogram everything read() returns, one bounded block at a time.
+
+    Each block is vectorized when its lines share one width. Other blocks
+    (blank lines, ragged rows, stray whitespace, invalid cells) go through
+    `histogram`, so they are accepted or rejected exactly as in the
+    line-by-line path.
+    """
+    bins = np.zeros(BOARD_LEN + 1, dtype=np.int64)
+    board_count = 0
+    matches: List[str] = []
+    for block in _iter_blocks(read):
+        result = _histogram_fixed_width(block, target)
+        if result is None:
+            # bytes.splitlines honours \n, \r\n and bare \r like text mode.
+            result = histogram(block.splitlines(), target)
+        block_count, block_bins, block_matches = result
+        if block_bins.size > bins.size:
+            bins = np.pad(bins, (0, block_bins.size - bins.size))
+        bins[: block_bins.size] += block_bins
+        board_count += block_count
+        matches.extend(block_matches)
+    return board_count, bins, matches
+
+
+def histogram_bulk(
+    handle: Union[TextIO, BinaryIO], target: Optional[int] = None
+) -> tuple[int, np.ndarray, List[str]]:
+    """Like `histogram`, but reads the handle in blocks and counts stones with NumPy."""
+    # Text handles such as sys.stdin expose their raw bytes via .buffer.
+    return _histogram_stream(getattr(handle, "buffer", handle).read, target)
+
+
+def _mapped_reader(mapped: mmap.mmap) -> Callable[[int], bytes]:
+    """Return a read() for mapped that unmaps pages once they are copied out."""
+    released = 0
+
+    def read(size: int) -> bytes:
+        nonlocal released
+        chunk = mapped.read(size)
+        if hasattr(mmap, "MADV_DONTNEED"):
+            # Pages stay in the page cache; this only keeps them from
+            # accumulating in the process's resident set.
+            done = mapped.tell() // mmap.PAGESIZE * mmap.PAGESIZE
+            if done > released:
+                mapped.madvise(mmap.MADV_DONTNEED, released, done - released)
+                released = done
+        return chunk
+
+    return read
+
+
+def histogram_path(
+    path: str, target: Optional[int] = None
+) -> tuple[int, np.ndarray, List[str]]:
+    """Histogram the board file at path, memory-mapping it when possible."""
+    with open(path, "rb") as handle:
+        try:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Empty files and pipes cannot be mapped.
+            return histogram_bulk(handle, target)
+        with mapped:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            return _histogram_stream(_mapped_reader(mapped), target)
+
+
+def _to_counter(bins: np.ndarray) -> Counter[int]:
+    """Convert a dense stone histogram to a Counter of non-zero bins."""
+    return Counter({stones: n for stones, n in enumerate(bins.tolist()) if n})
+
+
+def summarize(
+    handle: Union[TextIO, BinaryIO], target: Optional[int] = None
+) -> tuple[int, Counter[int], List[str]]:
+    """Process the handle, returning (board_count, stone_counter, matching_boards)."""
+    board_count, bins, matches = histogram(handle, target)
+    return board_count, _to_counter(bins), matches
+
+
+def summarize_bulk(
+    handle: Union[TextIO, BinaryIO], target: Optional[int] = None
+) -> tuple[int, Counter[int], List[str]]:
+    """Counter-returning wrapper around `histogram_bulk`."""
+    board_count, bins, matches = histogram_bulk(handle, target)
+    return board_count, _to_counter(bins), matches
+
+
+def summarize_path(
+    path: str, target: Optional[int] = None
+) -> tuple[int, Counter[int], List[str]]:
+    """Counter-returning wrapper around `histogram_path`."""
+    board_count, bins, matches = histogram_path(path, target)
+    return board_count, _to_counter(bins), matches
 
 
 def main() -> None:
@@ -57,22 +275,23 @@ def main() -> None:
     args = parser.parse_args()
 
     if args.path:
-        with open(args.path, "r", encoding="utf-8") as handle:
-            board_count, counter, matches = summarize(handle, args.stones)
+        board_count, bins, matches = histogram_path(args.path, args.stones)
     else:
-        board_count, counter, matches = summarize(sys.stdin, args.stones)
+        board_count, bins, matches = histogram_bulk(sys.stdin, args.stones)
 
     if board_count == 0:
         print("盤面が見つかりませんでした。")
         return
 
-    total_stones = sum(stones * num_boards for stones, num_boards in counter.items())
+    total_stones = int(np.dot(np.arange(bins.size), bins))
     average = total_stones / board_count
 
     print(f"平均石数: {average:.6f}")
     print("石数ごとの盤面数:")
-    for stones, num_boards in sorted(counter.items()):
-        print(f"  {stones}: {num_boards}")
+    # Bins are already indexed by stone count, so no sorting is needed.
+    for stones, num_boards in enumerate(bins.tolist()):
+        if num_boards:
+            print(f"  {stones}: {num_boards}")
 
     if args.stones is not None:
         print(f"\n石数 {args.stones} の盤面一覧:")
@@ -2,10 +2,13 @@
 """Generate a Markdown stone-count distribution table from board files."""
 
 import argparse
+import os
 import sys
-from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable
+from typing import Iterator
+
+import numpy as np
 
 
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -13,62 +16,72 @@ if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
 try:
-    from stone_stats import summarize  # type: ignore
+    from stone_stats import histogram_path  # type: ignore
 except ImportError as exc:  # pragma: no cover - guard for misconfigured PYTHONPATH
     raise SystemExit(
         "Failed to import stone_stats. Run this script from the repository root."
     ) from exc
 
 
-def iter_stone_counts(counters: Iterable[dict[int, int]]) -> list[int]:
-    """Return sorted list of stone counts present across all counters."""
-    stones = set()
-    for counter in counters:
-        stones.update(counter.keys())
-    return sorted(stones)
-
+def iter_table_lines(names: list[str], hist_matrix: np.ndarray) -> Iterator[str]:
+    """Yield Markdown table lines (without leading/trailing blank lines).
 
-def build_table(
-    stone_counts: Iterable[int],
-    stats: "OrderedDict[str, tuple[int, dict[int, int]]]",
-) -> list[str]:
-    """Return Markdown table lines (without leading/trailing blank lines)."""
-    headers = ["Stones", *stats.keys()]
+    Only stone counts seen in at least one file get a row.
+    """
+    headers = ["Stones", *names]
     header_line = "| " + " | ".join(headers) + " |"
     divider_line = "| " + " | ".join(["---"] * len(headers)) + " |"
 
-    lines = [header_line, divider_line]
-    for stone in stone_counts:
-        row = [str(stone)]
-        for _, (_, counter) in stats.items():
-            row.append(str(counter.get(stone, 0)))
-        lines.append("| " + " | ".join(row) + " |")
-    return lines
-
-
-def load_stats(paths: list[Path]) -> "OrderedDict[str, tuple[int, dict[int, int]]]":
-    """Read each path and collect board counts and per-stone frequencies."""
-    stats: "OrderedDict[str, tuple[int, dict[int, int]]]" = OrderedDict()
-    for path in paths:
-        with path.open("r", encoding="utf-8") as handle:
-            board_count, counter, _ = summarize(handle)
-        stats[path.name] = (board_count, dict(counter))
-    return stats
-
-
-def generate_markdown(
-    stats: "OrderedDict[str, tuple[int, dict[int, int]]]", title: str
-) -> str:
-    """Return complete Markdown document for the collected statistics."""
-    stone_counts = iter_stone_counts(counter for _, counter in stats.values())
-    lines = [title, ""]
-    lines.extend(build_table(stone_counts, stats))
-    lines.append("")
-    lines.append("Totals")
-    for name, (boards, _) in stats.items():
-        lines.append(f"- {name}: {boards} boards")
-    lines.append("")
-    return "\n".join(lines)
+    present = hist_matrix.any(axis=1)
+    cells = np.char.mod("%d", hist_matrix[present]).tolist()
+
+    yield header_line
+    yield divider_line
+    for stone, row in zip(np.flatnonzero(present).tolist(), cells):
+        yield f"| {stone} | " + " | ".join(row) + " |"
+
+
+def _histogram_path(path: Path) -> tuple[str, int, np.ndarray]:
+    """Worker entry point: histogram one file and return picklable results."""
+    board_count, bins, _ = histogram_path(str(path))
+    return path.name, board_count, bins
+
+
+def load_stats(paths: list[Path]) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """Read each path and collect board counts and per-stone frequencies.
+
+    Returns (names, board_counts, hist_matrix), where hist_matrix[n, j] is
+    the number of boards with n stones in paths[j]. Files are summarized in
+    separate worker processes; results keep the order of paths.
+    """
+    workers = min(len(paths), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_histogram_path, paths))
+    else:
+        results = [_histogram_path(path) for path in paths]
+
+    names = [name for name, _, _ in results]
+    board_counts = np.array([count for _, count, _ in results], dtype=np.int64)
+    # Histograms only differ in length for boards wider than BOARD_LEN.
+    n_bins = max(bins.size for _, _, bins in results)
+    hist_matrix = np.column_stack(
+        [np.pad(bins, (0, n_bins - bins.size)) for _, _, bins in results]
+    )
+    return names, board_counts, hist_matrix
+
+
+def iter_markdown(
+    names: list[str], board_counts: np.ndarray, hist_matrix: np.ndarray, title: str
+) -> Iterator[str]:
+    """Yield the lines (without newlines) of the Markdown document."""
+    yield title
+    yield ""
+    yield from iter_table_lines(names, hist_matrix)
+    yield ""
+    yield "Totals"
+    for name, boards in zip(names, board_counts.tolist()):
+        yield f"- {name}: {boards} boards"
 
 
 def parse_args() -> argparse.Namespace:
@@ -104,10 +117,11 @@ def main() -> None:
         missing_list = ", ".join(missing)
         raise SystemExit(f"Input file not found: {missing_list}")
 
-    stats = load_stats(input_paths)
-    markdown = generate_markdown(stats, args.title)
+    names, board_counts, hist_matrix = load_stats(input_paths)
+    lines = iter_markdown(names, board_counts, hist_matrix, args.title)
     args.output.parent.mkdir(parents=True, exist_ok=True)
-    args.output.write_text(markdown, encoding="utf-8")
+    with args.output.open("w", encoding="utf-8", buffering=1 << 20) as fh:
+        fh.writelines(line + "\n" for line in lines)
 
 
 if __name__ == "__main__":